@@ -1,9 +1,47 @@
+from pathlib import Path
+
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 
+try:
+    from plotly_resampler import FigureResampler
+    from plotly_resampler.aggregation import LTTB
+except ImportError:  # optional dependency; fall back to stride downsampling
+    FigureResampler = LTTB = None
+
+try:
+    import polars as pl
+except ImportError:  # optional dependency; fall back to the pyarrow reader
+    pl = None
+
+# Cap on points per trend trace sent to the browser; beyond this the chart is
+# downsampled server-side so render time stays flat as the date range grows
+_MAX_TREND_POINTS = 2000
+
+# Shared dark theme, registered once instead of repeating the same styling
+# dicts inside every chart builder; template axis defaults apply to every
+# axis in a subplot grid
+pio.templates['dashboard_dark'] = go.layout.Template(
+    layout=dict(
+        plot_bgcolor='#334155',
+        paper_bgcolor='#334155',
+        font=dict(color='#f1f5f9', size=12),
+        title=dict(font=dict(size=18, color='#f1f5f9')),
+        legend=dict(font=dict(color='#cbd5e1')),
+        xaxis=dict(gridcolor='#475569', showgrid=True,
+                   title=dict(font=dict(color='#cbd5e1')),
+                   tickfont=dict(color='#94a3b8')),
+        yaxis=dict(gridcolor='#475569', showgrid=True,
+                   title=dict(font=dict(color='#cbd5e1')),
+                   tickfont=dict(color='#94a3b8')),
+    )
+)
+
 # Page configuration
 st.set_page_config(
     page_title="Marketing Intelligence Dashboard",
@@ -31,58 +69,176 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
+def _frame_values(df, name):
+    """Fetch a column or index level by name, or None if absent"""
+    if name in df.columns:
+        return df[name]
+    if name in (df.index.names or ()):
+        return df.index.get_level_values(name)
+    return None
+
+def _filter_key(df):
+    """Cheap cache key for a filtered dataframe.
+
+    Hashing every cell of the dataframe on each rerun would cost more than the
+    aggregation it guards, so key on the things the sidebar filters can change:
+    row count, date span and the selected platform/state sets.
+    """
+    key = [len(df), tuple(df.columns)]
+    dates = _frame_values(df, 'date')
+    if dates is not None:
+        key.extend([dates.min(), dates.max()])
+    for name in ('platform', 'state'):
+        values = _frame_values(df, name)
+        if values is not None:
+            key.append(tuple(sorted(values.unique())))
+    return tuple(key)
+
+_CACHE_KWARGS = dict(show_spinner=False, hash_funcs={pd.DataFrame: _filter_key})
+
+# Narrow dtypes at parse time: the 120-day totals fit comfortably in
+# int32/float32 and every downstream groupby/corr moves half the bytes
+_MARKETING_DTYPES = {
+    'impression': 'int32',
+    'clicks': 'int32',
+    'spend': 'float32',
+    'attributed revenue': 'float32',
+}
+_BUSINESS_DTYPES = {
+    '# of orders': 'int32',
+    '# of new orders': 'int32',
+    'new customers': 'int32',
+    'total revenue': 'float32',
+    'gross profit': 'float32',
+    'COGS': 'float32',
+}
+
+# Low-cardinality string keys stored as Categorical so groupby hashes int
+# codes instead of strings; every groupby on these passes observed=True
+_CATEGORY_COLS = ('platform', 'tactic', 'state', 'campaign')
+
+_POLARS_DTYPES = {'int32': 'Int32', 'float32': 'Float32'}
+
+def _read_dataset(path, dtypes):
+    """Read a CSV with a parallel parser, parsing dates inline.
+
+    polars' reader is preferred when installed (threaded parse straight into
+    the target schema); otherwise pandas' pyarrow engine covers the same
+    ground. A parquet sidecar is written on first read and preferred
+    afterwards, so cold starts skip CSV parsing entirely once the cache
+    exists.
+    """
+    csv_path = Path(path)
+    parquet_path = csv_path.with_suffix('.parquet')
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+        return pd.read_parquet(parquet_path)
+
+    if pl is not None:
+        schema = {col: getattr(pl, _POLARS_DTYPES[dt]) for col, dt in dtypes.items()}
+        df = pl.read_csv(csv_path, try_parse_dates=True, schema_overrides=schema).to_pandas()
+    else:
+        df = pd.read_csv(csv_path, engine='pyarrow', parse_dates=['date'], dtype=dtypes)
+    try:
+        df.to_parquet(parquet_path, compression='zstd')
+    except (ImportError, OSError):
+        pass  # cache is best-effort; read-only deployments still work
+    return df
+
+@st.cache_data(**_CACHE_KWARGS)
+def build_cube(marketing_df):
+    """Pre-aggregate once at the finest granularity.
+
+    Every chart derives its coarser view from this small cube instead of
+    rescanning the raw rows, and the cached result survives across reruns
+    independently of the frame it was built from.
+    """
+    return marketing_df.groupby(
+        ['date', 'platform', 'tactic', 'state', 'campaign'],
+        observed=True, sort=False
+    )[['impression', 'clicks', 'spend', 'attributed revenue']].sum()
+
+@st.cache_data(persist="disk", show_spinner=False)
 def load_data():
     """Load and preprocess all datasets"""
     try:
         # Load datasets
-        business_df = pd.read_csv('Marketing Intelligence Dashboard/business.csv')
-        facebook_df = pd.read_csv('Marketing Intelligence Dashboard/Facebook.csv')
-        google_df = pd.read_csv('Marketing Intelligence Dashboard/Google.csv')
-        tiktok_df = pd.read_csv('Marketing Intelligence Dashboard/TikTok.csv')
-        
-        # Convert date columns
-        for df in [business_df, facebook_df, google_df, tiktok_df]:
-            df['date'] = pd.to_datetime(df['date'])
-        
-        # Add platform column
-        facebook_df['platform'] = 'Facebook'
-        google_df['platform'] = 'Google'
-        tiktok_df['platform'] = 'TikTok'
-        
-        # Combine marketing data
-        marketing_df = pd.concat([facebook_df, google_df, tiktok_df], ignore_index=True)
-        
-        # Calculate additional metrics
-        marketing_df['ctr'] = (marketing_df['clicks'] / marketing_df['impression'] * 100).round(2)
-        marketing_df['cpc'] = (marketing_df['spend'] / marketing_df['clicks']).round(2)
-        marketing_df['cpm'] = (marketing_df['spend'] / marketing_df['impression'] * 1000).round(2)
-        
-        # Aggregate marketing data by date
-        daily_marketing = marketing_df.groupby('date').agg({
-            'impression': 'sum',
-            'clicks': 'sum',
-            'spend': 'sum',
-            'attributed revenue': 'sum'
-        }).reset_index()
-        
-        daily_marketing['ctr'] = (daily_marketing['clicks'] / daily_marketing['impression'] * 100).round(2)
-        daily_marketing['cpc'] = (daily_marketing['spend'] / daily_marketing['clicks']).round(2)
+        business_df = _read_dataset('Marketing Intelligence Dashboard/business.csv', _BUSINESS_DTYPES)
+        facebook_df = _read_dataset('Marketing Intelligence Dashboard/Facebook.csv', _MARKETING_DTYPES)
+        google_df = _read_dataset('Marketing Intelligence Dashboard/Google.csv', _MARKETING_DTYPES)
+        tiktok_df = _read_dataset('Marketing Intelligence Dashboard/TikTok.csv', _MARKETING_DTYPES)
+
+        # Combine marketing data in one copy; the platform column is built
+        # straight from int8 codes, skipping both the per-frame label writes
+        # and the MultiIndex round-trip a keyed concat would need
+        marketing_df = pd.concat([facebook_df, google_df, tiktok_df],
+                                 ignore_index=True)
+        platform_codes = np.repeat(np.arange(3, dtype=np.int8),
+                                   [len(facebook_df), len(google_df), len(tiktok_df)])
+        marketing_df['platform'] = pd.Categorical.from_codes(
+            platform_codes, categories=['Facebook', 'Google', 'TikTok'])
+
+        for col in _CATEGORY_COLS:
+            if col != 'platform':
+                marketing_df[col] = marketing_df[col].astype('category')
+
+        # Row-level ratios (ctr/cpc) are only needed by the detail table, so
+        # they are materialized lazily in _marketing_with_ratios rather than
+        # carried as extra columns through every rerun here
+
+        # Keep rows sorted by date so date-range filtering can binary-search a
+        # contiguous slice instead of scanning a boolean mask; the cube built
+        # below inherits this ordering in its date level
+        marketing_df = marketing_df.sort_values('date', kind='stable', ignore_index=True)
         
-        # Merge business and marketing data
-        combined_df = pd.merge(business_df, daily_marketing, on='date', how='left')
+        # Aggregate marketing data by date; rows are already date-sorted, so
+        # sort=False keeps that order for free and skips the post-group sort
+        daily_marketing = marketing_df.groupby('date', as_index=False, observed=True, sort=False)[
+            ['impression', 'clicks', 'spend', 'attributed revenue']].sum()
         
-        # Calculate additional business metrics
-        combined_df['avg_order_value'] = (combined_df['total revenue'] / combined_df['# of orders']).round(2)
-        combined_df['customer_acquisition_cost'] = (combined_df['spend'] / combined_df['new customers']).round(2)
-        combined_df['marketing_attribution_rate'] = (combined_df['attributed revenue'] / combined_df['total revenue'] * 100).round(2)
-        combined_df['profit_margin'] = (combined_df['gross profit'] / combined_df['total revenue'] * 100).round(2)
+        daily_marketing.eval(
+            '''
+            ctr = clicks / impression * 100
+            cpc = spend / clicks
+            ''',
+            inplace=True,
+        )
         
-        return business_df, marketing_df, combined_df
+        # Merge business and marketing data; both sides are unique sorted daily
+        # dates, so an index-aligned join takes the sorted-merge fast path
+        # instead of building a hash table
+        combined_df = (business_df.set_index('date')
+                       .join(daily_marketing.set_index('date'), how='left')
+                       .sort_index()
+                       .reset_index())
         
+        # Calculate additional business metrics in one eval block: with
+        # numexpr installed the arithmetic fuses into a single multithreaded
+        # pass with no per-op temporaries; rounding is left to the display
+        # layer
+        combined_df.eval(
+            '''
+            avg_order_value = `total revenue` / `# of orders`
+            customer_acquisition_cost = spend / `new customers`
+            marketing_attribution_rate = `attributed revenue` / `total revenue` * 100
+            profit_margin = `gross profit` / `total revenue` * 100
+            ''',
+            inplace=True,
+        )
+
+        # groupby sums and eval outputs come back 64-bit even though the
+        # inputs were narrow; squeeze them down so combined_df stays half-width
+        # end to end
+        for col, dtype in combined_df.dtypes.items():
+            if dtype == np.float64:
+                combined_df[col] = combined_df[col].astype('float32')
+            elif dtype == np.int64:
+                combined_df[col] = pd.to_numeric(combined_df[col], downcast='integer')
+
+        return business_df, marketing_df, combined_df, build_cube(marketing_df)
+
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return None, None, None
+        return None, None, None, None
 
 def create_kpi_cards(combined_df):
     """Create KPI metric cards"""
@@ -122,6 +278,13 @@ def create_kpi_cards(combined_df):
 
 def create_revenue_trend_chart(combined_df):
     """Create enhanced revenue trend chart with better visualization"""
+    # Without plotly-resampler, thin the rows ourselves so the payload stays
+    # bounded; with it, the full-resolution data is kept server-side and only
+    # visually significant points are transmitted (LTTB)
+    if FigureResampler is None and len(combined_df) > _MAX_TREND_POINTS:
+        step = -(-len(combined_df) // _MAX_TREND_POINTS)
+        combined_df = combined_df.iloc[::step]
+
     # Create subplots for better comparison
     fig = make_subplots(
         rows=2, cols=1,
@@ -133,7 +296,7 @@ def create_revenue_trend_chart(combined_df):
     
     # Line chart for revenue trends
     fig.add_trace(
-        go.Scatter(
+        go.Scattergl(
             x=combined_df['date'],
             y=combined_df['total revenue'],
             mode='lines+markers',
@@ -146,7 +309,7 @@ def create_revenue_trend_chart(combined_df):
     )
     
     fig.add_trace(
-        go.Scatter(
+        go.Scattergl(
             x=combined_df['date'],
             y=combined_df['attributed revenue'],
             mode='lines+markers',
@@ -185,14 +348,11 @@ def create_revenue_trend_chart(combined_df):
     
     # Update layout
     fig.update_layout(
+        template='dashboard_dark',
         height=850,
         showlegend=True,
-        plot_bgcolor='#334155',
-        paper_bgcolor='#334155',
-        font=dict(color='#f1f5f9', size=12),
         title=dict(
             text="💰 Revenue Performance Analysis",
-            font=dict(size=18, color='#f1f5f9'),
             x=0.5,
             y=0.99,
             xanchor='center',
@@ -203,63 +363,45 @@ def create_revenue_trend_chart(combined_df):
             yanchor="bottom",
             y=1.03,
             xanchor="right",
-            x=1,
-            font=dict(color='#cbd5e1')
+            x=1
         ),
         margin=dict(l=50, r=50, t=140, b=50)
     )
-    
+
     # Update axes
-    fig.update_xaxes(
-        title_text="Date",
-        title_font=dict(color='#cbd5e1'),
-        tickfont=dict(color='#94a3b8'),
-        gridcolor='#475569',
-        showgrid=True,
-        row=1, col=1
-    )
-    fig.update_yaxes(
-        title_text="Revenue ($)",
-        title_font=dict(color='#cbd5e1'),
-        tickfont=dict(color='#94a3b8'),
-        gridcolor='#475569',
-        showgrid=True,
-        tickformat='$,.0f',
-        row=1, col=1
-    )
-    
-    fig.update_xaxes(
-        title_text="Date",
-        title_font=dict(color='#cbd5e1'),
-        tickfont=dict(color='#94a3b8'),
-        gridcolor='#475569',
-        showgrid=True,
-        row=2, col=1
-    )
-    fig.update_yaxes(
-        title_text="Revenue ($)",
-        title_font=dict(color='#cbd5e1'),
-        tickfont=dict(color='#94a3b8'),
-        gridcolor='#475569',
-        showgrid=True,
-        tickformat='$,.0f',
-        row=2, col=1
-    )
-    
+    fig.update_xaxes(title_text="Date")
+    fig.update_yaxes(title_text="Revenue ($)", tickformat='$,.0f')
+
+    if FigureResampler is not None:
+        # LTTB keeps the visually significant extrema, so a downsampled trend
+        # is indistinguishable from the full series at screen resolution
+        fig = FigureResampler(fig, default_n_shown_samples=_MAX_TREND_POINTS,
+                              default_downsampler=LTTB())
+
     return fig
 
-def create_platform_performance_chart(marketing_df):
+@st.cache_data(**_CACHE_KWARGS)
+def _agg_platform_metrics(cube):
+    """Roll the cube up to platform level (cached across reruns)"""
+    platform_metrics = cube.groupby(level='platform', as_index=False, observed=True, sort=False).sum()
+
+    platform_metrics['ctr'] = (platform_metrics['clicks'] / platform_metrics['impression'] * 100)
+    platform_metrics['cpc'] = (platform_metrics['spend'] / platform_metrics['clicks'])
+
+    return platform_metrics
+
+def create_platform_performance_chart(cube):
     """Create platform performance comparison"""
-    platform_metrics = marketing_df.groupby('platform').agg({
-        'spend': 'sum',
-        'attributed revenue': 'sum',
-        'impression': 'sum',
-        'clicks': 'sum'
-    }).reset_index()
-    
-    platform_metrics['ctr'] = (platform_metrics['clicks'] / platform_metrics['impression'] * 100).round(2)
-    platform_metrics['cpc'] = (platform_metrics['spend'] / platform_metrics['clicks']).round(2)
-    
+    platform_metrics = _agg_platform_metrics(cube)
+
+    # Convert each series to a plain list once; go.Bar would otherwise
+    # re-coerce the same Series for every trace it appears in
+    platforms = platform_metrics['platform'].tolist()
+    spend = platform_metrics['spend'].tolist()
+    revenue = platform_metrics['attributed revenue'].tolist()
+    ctr = platform_metrics['ctr'].tolist()
+    cpc = platform_metrics['cpc'].tolist()
+
     fig = make_subplots(
         rows=2, cols=2,
         subplot_titles=('Spend by Platform', 'Revenue by Platform', 'CTR by Platform', 'CPC by Platform'),
@@ -269,25 +411,25 @@ def create_platform_performance_chart(marketing_df):
     
     # Spend
     fig.add_trace(
-        go.Bar(x=platform_metrics['platform'], y=platform_metrics['spend'], name='Spend', marker_color='#1f77b4'),
+        go.Bar(x=platforms, y=spend, name='Spend', marker_color='#1f77b4'),
         row=1, col=1
     )
     
     # Revenue
     fig.add_trace(
-        go.Bar(x=platform_metrics['platform'], y=platform_metrics['attributed revenue'], name='Revenue', marker_color='#ff7f0e'),
+        go.Bar(x=platforms, y=revenue, name='Revenue', marker_color='#ff7f0e'),
         row=1, col=2
     )
     
     # CTR
     fig.add_trace(
-        go.Bar(x=platform_metrics['platform'], y=platform_metrics['ctr'], name='CTR', marker_color='#2ca02c'),
+        go.Bar(x=platforms, y=ctr, name='CTR', marker_color='#2ca02c'),
         row=2, col=1
     )
     
     # CPC
     fig.add_trace(
-        go.Bar(x=platform_metrics['platform'], y=platform_metrics['cpc'], name='CPC', marker_color='#d62728'),
+        go.Bar(x=platforms, y=cpc, name='CPC', marker_color='#d62728'),
         row=2, col=2
     )
     
@@ -301,20 +443,22 @@ def create_platform_performance_chart(marketing_df):
     
     return fig
 
-def create_tactic_performance_chart(marketing_df):
+@st.cache_data(**_CACHE_KWARGS)
+def _agg_tactic_metrics(cube):
+    """Roll the cube up to platform/tactic level (cached across reruns)"""
+    tactic_metrics = cube.groupby(level=['platform', 'tactic'], as_index=False, observed=True, sort=False).sum()
+
+    tactic_metrics['ctr'] = (tactic_metrics['clicks'] / tactic_metrics['impression'] * 100)
+    tactic_metrics['cpc'] = (tactic_metrics['spend'] / tactic_metrics['clicks'])
+    tactic_metrics['efficiency'] = (tactic_metrics['attributed revenue'] / tactic_metrics['impression'] * 1000)
+    tactic_metrics['tactic_platform'] = tactic_metrics['tactic'].astype(str) + ' (' + tactic_metrics['platform'].astype(str) + ')'
+
+    return tactic_metrics
+
+def create_tactic_performance_chart(cube):
     """Create enhanced tactic performance analysis with better visualization"""
-    tactic_metrics = marketing_df.groupby(['platform', 'tactic']).agg({
-        'spend': 'sum',
-        'attributed revenue': 'sum',
-        'impression': 'sum',
-        'clicks': 'sum'
-    }).reset_index()
-    
-    tactic_metrics['ctr'] = (tactic_metrics['clicks'] / tactic_metrics['impression'] * 100).round(2)
-    tactic_metrics['cpc'] = (tactic_metrics['spend'] / tactic_metrics['clicks']).round(2)
-    tactic_metrics['efficiency'] = (tactic_metrics['attributed revenue'] / tactic_metrics['impression'] * 1000).round(2)
-    tactic_metrics['tactic_platform'] = tactic_metrics['tactic'] + ' (' + tactic_metrics['platform'] + ')'
-    
+    tactic_metrics = _agg_tactic_metrics(cube)
+
     # Create subplots
     fig = make_subplots(
         rows=1, cols=2,
@@ -325,7 +469,7 @@ def create_tactic_performance_chart(marketing_df):
     
     # Bubble chart: Spend vs Revenue with CTR as size and CPC as color
     fig.add_trace(
-        go.Scatter(
+        go.Scattergl(
             x=tactic_metrics['spend'],
             y=tactic_metrics['attributed revenue'],
             mode='markers+text',
@@ -369,100 +513,103 @@ def create_tactic_performance_chart(marketing_df):
     
     # Update layout
     fig.update_layout(
+        template='dashboard_dark',
         height=600,
         showlegend=False,
-        plot_bgcolor='#334155',
-        paper_bgcolor='#334155',
-        font=dict(color='#f1f5f9', size=12),
         title=dict(
             text="🎯 Tactic Performance Analysis",
-            font=dict(size=18, color='#f1f5f9'),
             x=0.5,
             y=0.98
         ),
         margin=dict(l=50, r=50, t=80, b=50)
     )
-    
-    # Update axes for scatter plot
-    fig.update_xaxes(
-        title_text="Spend ($)",
-        title_font=dict(color='#cbd5e1'),
-        tickfont=dict(color='#94a3b8'),
-        gridcolor='#475569',
-        showgrid=True,
-        row=1, col=1
-    )
-    fig.update_yaxes(
-        title_text="Attributed Revenue ($)",
-        title_font=dict(color='#cbd5e1'),
-        tickfont=dict(color='#94a3b8'),
-        gridcolor='#475569',
-        showgrid=True,
-        row=1, col=1
-    )
-    
-    # Update axes for bar chart
-    fig.update_xaxes(
-        title_text="CTR (%)",
-        title_font=dict(color='#cbd5e1'),
-        tickfont=dict(color='#94a3b8'),
-        gridcolor='#475569',
-        showgrid=True,
-        row=1, col=2
-    )
-    fig.update_yaxes(
-        title_text="Tactic (Platform)",
-        title_font=dict(color='#cbd5e1'),
-        tickfont=dict(color='#94a3b8'),
-        gridcolor='#475569',
-        showgrid=True,
-        row=1, col=2
-    )
-    
+
+    # Axis titles per subplot; the colors and grid come from the template
+    fig.update_xaxes(title_text="Spend ($)", row=1, col=1)
+    fig.update_yaxes(title_text="Attributed Revenue ($)", row=1, col=1)
+    fig.update_xaxes(title_text="CTR (%)", row=1, col=2)
+    fig.update_yaxes(title_text="Tactic (Platform)", row=1, col=2)
+
     return fig
 
-def create_geographic_analysis(marketing_df):
+@st.cache_data(**_CACHE_KWARGS)
+def _agg_state_platform_metrics(cube):
+    """Roll the cube up to state/platform level (cached across reruns).
+
+    Every chart in the state section derives from this one small frame, so the
+    cube is only scanned once for the whole section.
+    """
+    return cube.groupby(level=['state', 'platform'], as_index=False, observed=True, sort=False).sum()
+
+@st.cache_data(**_CACHE_KWARGS)
+def _agg_geo_metrics(cube):
+    """Per-platform/state CTR and CPC derived from the shared state rollup"""
+    geo_metrics = _agg_state_platform_metrics(cube)
+
+    geo_metrics['ctr'] = (geo_metrics['clicks'] / geo_metrics['impression'] * 100)
+    geo_metrics['cpc'] = (geo_metrics['spend'] / geo_metrics['clicks'])
+
+    return geo_metrics
+
+def create_geographic_analysis(cube):
     """Create geographic performance analysis"""
-    geo_metrics = marketing_df.groupby(['platform', 'state']).agg({
-        'spend': 'sum',
-        'attributed revenue': 'sum',
-        'impression': 'sum',
-        'clicks': 'sum'
-    }).reset_index()
-    
-    geo_metrics['ctr'] = (geo_metrics['clicks'] / geo_metrics['impression'] * 100).round(2)
-    geo_metrics['cpc'] = (geo_metrics['spend'] / geo_metrics['clicks']).round(2)
-    
-    fig = px.bar(
-        geo_metrics,
-        x='platform',
-        y='ctr',
-        color='state',
+    geo_metrics = _agg_geo_metrics(cube)
+
+    # Build the grouped bars directly; px.bar would re-derive a figure
+    # template and copy the frame per color group on every call
+    fig = go.Figure()
+    for state in geo_metrics['state'].unique():
+        sub = geo_metrics[geo_metrics['state'] == state]
+        fig.add_trace(go.Bar(name=str(state), x=sub['platform'].tolist(),
+                             y=sub['ctr'].tolist()))
+
+    fig.update_layout(
+        barmode='group',
         title="CTR by Platform and State",
-        barmode='group'
+        xaxis_title='platform',
+        yaxis_title='ctr',
+        legend_title_text='state',
+        height=400,
     )
-    
-    fig.update_layout(height=400)
     return fig
 
-def create_state_wise_analysis(marketing_df):
+@st.cache_data(**_CACHE_KWARGS)
+def create_state_wise_analysis(cube):
     """Create comprehensive state-wise analysis"""
-    state_metrics = marketing_df.groupby('state').agg({
-        'spend': 'sum',
-        'attributed revenue': 'sum',
-        'impression': 'sum',
-        'clicks': 'sum',
-        'platform': 'nunique'
-    }).reset_index()
-    
-    state_metrics['ctr'] = (state_metrics['clicks'] / state_metrics['impression'] * 100).round(2)
-    state_metrics['cpc'] = (state_metrics['spend'] / state_metrics['clicks']).round(2)
-    state_metrics['cpm'] = (state_metrics['spend'] / state_metrics['impression'] * 1000).round(2)
-    
+    state_platform = _agg_state_platform_metrics(cube)
+    # each observed platform contributes exactly one state/platform row, so a
+    # plain size aggregation gives the platform count without the per-group
+    # hash sets a 'platform': 'nunique' agg would build
+    state_metrics = state_platform.groupby('state', as_index=False, observed=True, sort=False).agg(**{
+        'spend': ('spend', 'sum'),
+        'attributed revenue': ('attributed revenue', 'sum'),
+        'impression': ('impression', 'sum'),
+        'clicks': ('clicks', 'sum'),
+        'platform': ('platform', 'size'),
+    })
+
+    # One stacked division for all four ratios instead of four Series ops,
+    # each of which would allocate its own intermediates
+    num = state_metrics[['attributed revenue', 'clicks', 'spend', 'spend']].to_numpy(dtype=np.float32)
+    den = state_metrics[['spend', 'impression', 'clicks', 'impression']].to_numpy(dtype=np.float32)
+    ratios = np.zeros_like(num)
+    np.divide(num, den, out=ratios, where=den > 0)
+    ratios[:, 1] *= 100    # ctr is a percentage
+    ratios[:, 3] *= 1000   # cpm is per thousand impressions
+    state_metrics[['roas', 'ctr', 'cpc', 'cpm']] = ratios
+
+
     return state_metrics
 
 def create_state_performance_chart(state_metrics):
     """Create state performance comparison chart"""
+    # Same single tolist() conversion pattern as the platform chart
+    states = state_metrics['state'].tolist()
+    revenue = state_metrics['attributed revenue'].tolist()
+    spend = state_metrics['spend'].tolist()
+    ctr = state_metrics['ctr'].tolist()
+    cpc = state_metrics['cpc'].tolist()
+
     fig = make_subplots(
         rows=2, cols=2,
         subplot_titles=('Revenue by State', 'Spend by State', 'CTR by State', 'CPC by State'),
@@ -472,28 +619,28 @@ def create_state_performance_chart(state_metrics):
     
     # Revenue
     fig.add_trace(
-        go.Bar(x=state_metrics['state'], y=state_metrics['attributed revenue'], 
+        go.Bar(x=states, y=revenue,
                name='Revenue', marker_color='#1f77b4'),
         row=1, col=1
     )
     
     # Spend
     fig.add_trace(
-        go.Bar(x=state_metrics['state'], y=state_metrics['spend'], 
+        go.Bar(x=states, y=spend,
                name='Spend', marker_color='#ff7f0e'),
         row=1, col=2
     )
     
     # CTR
     fig.add_trace(
-        go.Bar(x=state_metrics['state'], y=state_metrics['ctr'], 
+        go.Bar(x=states, y=ctr,
                name='CTR', marker_color='#2ca02c'),
         row=2, col=1
     )
     
     # CPC
     fig.add_trace(
-        go.Bar(x=state_metrics['state'], y=state_metrics['cpc'], 
+        go.Bar(x=states, y=cpc,
                name='CPC', marker_color='#d62728'),
         row=2, col=2
     )
@@ -508,23 +655,41 @@ def create_state_performance_chart(state_metrics):
     
     return fig
 
-def create_state_platform_breakdown(marketing_df):
+@st.cache_data(**_CACHE_KWARGS)
+def _agg_state_platform_ctr(cube):
+    """CTR matrix (state x platform) for the heatmap, cached across reruns.
+
+    The fixed-cardinality key pair maps to a flat cell index from the
+    Categorical codes, so two np.bincount calls replace groupby + pivot +
+    fillna: one pass, no hash tables, and empty cells arrive as zeros.
+    """
+    states = cube.index.get_level_values('state')
+    platforms = cube.index.get_level_values('platform')
+    state_cats, plat_cats = states.categories, platforms.categories
+
+    n_cells = len(state_cats) * len(plat_cats)
+    cell = states.codes.astype(np.intp) * len(plat_cats) + platforms.codes
+    clicks = np.bincount(cell, weights=cube['clicks'].to_numpy(), minlength=n_cells)
+    impressions = np.bincount(cell, weights=cube['impression'].to_numpy(), minlength=n_cells)
+
+    ctr = np.zeros(n_cells)
+    np.divide(clicks, impressions, out=ctr, where=impressions != 0)
+    ctr = (ctr * 100).reshape(len(state_cats), len(plat_cats))
+
+    # Only observed categories: after filtering, unselected states/platforms
+    # should not show up as all-zero heatmap rows
+    observed_s = np.unique(states.codes)
+    observed_p = np.unique(platforms.codes)
+    return pd.DataFrame(ctr[np.ix_(observed_s, observed_p)],
+                        index=state_cats[observed_s], columns=plat_cats[observed_p])
+
+def create_state_platform_breakdown(cube):
     """Create state-platform breakdown heatmap"""
-    state_platform = marketing_df.groupby(['state', 'platform']).agg({
-        'spend': 'sum',
-        'attributed revenue': 'sum',
-        'impression': 'sum',
-        'clicks': 'sum'
-    }).reset_index()
-    
-    state_platform['ctr'] = (state_platform['clicks'] / state_platform['impression'] * 100).round(2)
-    
-    # Create pivot table for heatmap
-    pivot_ctr = state_platform.pivot(index='state', columns='platform', values='ctr').fillna(0)
-    
+    pivot_ctr = _agg_state_platform_ctr(cube)
+
     fig = px.imshow(
         pivot_ctr,
-        text_auto=True,
+        text_auto='.2f',
         aspect="auto",
         title="CTR Heatmap: State vs Platform",
         color_continuous_scale='Blues'
@@ -533,20 +698,26 @@ def create_state_platform_breakdown(marketing_df):
     fig.update_layout(height=400)
     return fig
 
-def create_campaign_analysis(marketing_df):
+@st.cache_data(**_CACHE_KWARGS)
+def _agg_campaign_metrics(cube):
+    """Roll the cube up to platform/campaign level (cached across reruns)"""
+    campaign_metrics = cube.groupby(level=['platform', 'campaign'], as_index=False, observed=True, sort=False).sum()
+
+    campaign_metrics['ctr'] = (campaign_metrics['clicks'] / campaign_metrics['impression'] * 100)
+    campaign_metrics['cpc'] = (campaign_metrics['spend'] / campaign_metrics['clicks'])
+
+    return campaign_metrics
+
+def create_campaign_analysis(cube):
     """Create top performing campaigns analysis"""
-    campaign_metrics = marketing_df.groupby(['platform', 'campaign']).agg({
-        'spend': 'sum',
-        'attributed revenue': 'sum',
-        'impression': 'sum',
-        'clicks': 'sum'
-    }).reset_index()
-    
-    campaign_metrics['ctr'] = (campaign_metrics['clicks'] / campaign_metrics['impression'] * 100).round(2)
-    campaign_metrics['cpc'] = (campaign_metrics['spend'] / campaign_metrics['clicks']).round(2)
-    
-    # Top 10 campaigns by revenue
-    top_campaigns = campaign_metrics.nlargest(10, 'attributed revenue')
+    campaign_metrics = _agg_campaign_metrics(cube)
+
+    # Top 10 campaigns by revenue: O(N) partition for the top-k set, then
+    # sort only those k rows instead of partial-sorting the whole column
+    rev = campaign_metrics['attributed revenue'].to_numpy()
+    k = min(10, len(rev))
+    idx = np.argpartition(rev, -k)[-k:]
+    top_campaigns = campaign_metrics.iloc[idx[np.argsort(rev[idx])[::-1]]]
     
     fig = px.bar(
         top_campaigns,
@@ -560,14 +731,25 @@ def create_campaign_analysis(marketing_df):
     fig.update_layout(height=500, yaxis={'categoryorder': 'total ascending'})
     return fig
 
+@st.cache_data(**_CACHE_KWARGS)
+def _agg_correlation_matrix(combined_df):
+    """Correlation matrix of marketing vs business metrics (cached across reruns)"""
+    numeric_cols = ['total revenue', 'gross profit', '# of orders', 'new customers',
+                   'spend', 'attributed revenue', 'impression', 'clicks', 'ctr', 'cpc']
+
+    # One BLAS-backed matrix product on a contiguous float32 block instead of
+    # pandas' per-column-pair dispatch; rows with any NaN are dropped rather
+    # than zero-filled so missing days don't distort the correlations
+    arr = np.ascontiguousarray(combined_df[numeric_cols].to_numpy(dtype=np.float32))
+    mask = ~np.isnan(arr).any(axis=1)
+    corr = np.corrcoef(arr[mask], rowvar=False)
+
+    return pd.DataFrame(corr, index=numeric_cols, columns=numeric_cols)
+
 def create_correlation_analysis(combined_df):
     """Create correlation analysis between marketing and business metrics"""
-    # Select numeric columns for correlation
-    numeric_cols = ['total revenue', 'gross profit', '# of orders', 'new customers', 
-                   'spend', 'attributed revenue', 'impression', 'clicks', 'ctr', 'cpc']
-    
-    corr_data = combined_df[numeric_cols].corr()
-    
+    corr_data = _agg_correlation_matrix(combined_df)
+
     fig = px.imshow(
         corr_data,
         text_auto=True,
@@ -580,13 +762,105 @@ def create_correlation_analysis(combined_df):
     return fig
 
 
+# Figure construction (dict building plus schema validation) is the remaining
+# per-rerun cost once the data is aggregated; cache each chart's serialized
+# JSON per filter state and rehydrate with a single parse on cache hits
+_FIG_BUILDERS = {
+    'revenue_trend': create_revenue_trend_chart,
+    'platform_performance': create_platform_performance_chart,
+    'tactic_performance': create_tactic_performance_chart,
+    'geographic': create_geographic_analysis,
+    'state_performance': create_state_performance_chart,
+    'state_platform_breakdown': create_state_platform_breakdown,
+    'campaign': create_campaign_analysis,
+    'correlation': create_correlation_analysis,
+}
+
+@st.cache_data(**_CACHE_KWARGS)
+def _chart_json(name, df, filter_sig):
+    """Serialized chart keyed by chart name and filter state.
+
+    filter_sig is the sidebar filter signature and does the real keying:
+    derived frames like state_metrics carry no date column, so the cheap
+    frame hash alone cannot tell two date windows apart.
+    """
+    return _FIG_BUILDERS[name](df).to_json()
+
+def cached_chart(name, df, filter_sig):
+    """Rebuild a cached chart from its serialized form"""
+    return pio.from_json(_chart_json(name, df, filter_sig))
+
+def _marketing_with_ratios(rows):
+    """Row-level ctr/cpc for the marketing detail table.
+
+    load_data no longer carries these columns on every row; they are built
+    here, on the already-filtered rows, only when the detail tab needs them.
+    Uncached on purpose: it only runs inside the _tab_views cache below.
+    """
+    imp = rows['impression'].to_numpy()
+    clk = rows['clicks'].to_numpy()
+    spd = rows['spend'].to_numpy()
+
+    ctr = np.zeros(len(rows), dtype=np.float32)
+    np.divide(clk, imp, out=ctr, where=imp != 0)
+    ctr *= 100
+
+    cpc = np.zeros(len(rows), dtype=np.float32)
+    np.divide(spd, clk, out=cpc, where=clk != 0)
+
+    return rows.assign(ctr=ctr, cpc=cpc)
+
+@st.cache_data(**_CACHE_KWARGS)
+def _tab_views(combined_df, marketing_df, state_metrics, date_window, platforms, states):
+    """Display-ready tables for the detail tabs (cached across reruns).
+
+    The detail tab is the only consumer of row-level marketing data, so the
+    sidebar filters are applied here — inside the cache — rather than on
+    every rerun in main.
+    """
+    rows = marketing_df
+    if date_window is not None:
+        dates = rows['date'].to_numpy()
+        lo = np.searchsorted(dates, date_window[0], side='left')
+        hi = np.searchsorted(dates, date_window[1], side='right')
+        rows = rows.iloc[lo:hi]
+
+    row_mask = np.ones(len(rows), dtype=bool)
+    if platforms:
+        row_mask &= rows['platform'].isin(platforms).to_numpy()
+    if states:
+        row_mask &= rows['state'].isin(states).to_numpy()
+    rows = rows[row_mask]
+
+    business_view = combined_df.loc[:, ['date', '# of orders', 'new customers', 'total revenue',
+                                        'gross profit', 'avg_order_value', 'profit_margin']]
+    marketing_view = _marketing_with_ratios(rows).loc[
+        :, ['date', 'platform', 'tactic', 'state', 'campaign',
+            'impression', 'clicks', 'spend', 'attributed revenue',
+            'ctr', 'cpc']]
+    state_view = state_metrics.loc[:, ['state', 'spend', 'attributed revenue', 'impression',
+                                       'clicks', 'ctr', 'cpc', 'cpm', 'platform']]
+    combined_view = combined_df.loc[:, ['date', 'total revenue', 'spend', 'attributed revenue',
+                                        'ctr', 'cpc', 'marketing_attribution_rate',
+                                        'customer_acquisition_cost']]
+    return business_view, marketing_view, state_view, combined_view
+
+def _two_decimal_config(df):
+    """Show float columns to two decimals without rewriting the data"""
+    return {
+        col: st.column_config.NumberColumn(format='%.2f')
+        for col in df.columns
+        if pd.api.types.is_float_dtype(df[col])
+    }
+
+
 def main():
     """Main dashboard function"""
     st.markdown('<h1 class="main-header">📊 Marketing Intelligence Dashboard</h1>', unsafe_allow_html=True)
     
     # Load data
-    business_df, marketing_df, combined_df = load_data()
-    
+    business_df, marketing_df, combined_df, cube = load_data()
+
     if combined_df is None:
         st.error("Failed to load data. Please check the file paths.")
         return
@@ -605,33 +879,66 @@ def main():
         max_value=max_date
     )
     
-    if len(date_range) == 2:
-        start_date, end_date = date_range
-        combined_df = combined_df[(combined_df['date'] >= pd.to_datetime(start_date)) & 
-                                 (combined_df['date'] <= pd.to_datetime(end_date))]
-        marketing_df = marketing_df[(marketing_df['date'] >= pd.to_datetime(start_date)) & 
-                                   (marketing_df['date'] <= pd.to_datetime(end_date))]
-    
     # Platform filter
     platforms = st.sidebar.multiselect(
         "Select Platforms",
         options=marketing_df['platform'].unique(),
         default=marketing_df['platform'].unique()
     )
-    
-    if platforms:
-        marketing_df = marketing_df[marketing_df['platform'].isin(platforms)]
-    
+
     # State filter
     states = st.sidebar.multiselect(
         "Select States",
         options=marketing_df['state'].unique(),
         default=marketing_df['state'].unique()
     )
-    
+
+    # Date filter first: the frames are sorted by date, so the window is a
+    # contiguous slice found by binary search — O(log N) instead of a full
+    # column scan, and iloc returns a view rather than a copied frame.
+    # The row-level marketing frame is left untouched: every chart reads the
+    # small cube, and the one consumer of raw rows (the detail tab) applies
+    # the filters inside its own cached builder.
+    date_window = None
+    if len(date_range) == 2:
+        start_date, end_date = date_range
+        start_ts = np.datetime64(pd.to_datetime(start_date))
+        end_ts = np.datetime64(pd.to_datetime(end_date))
+        date_window = (start_ts, end_ts)
+
+        cube_dates = cube.index.get_level_values('date').to_numpy()
+        lo, hi = np.searchsorted(cube_dates, start_ts, side='left'), np.searchsorted(cube_dates, end_ts, side='right')
+        cube = cube.iloc[lo:hi]
+
+        combined_dates = combined_df['date'].to_numpy()
+        lo, hi = np.searchsorted(combined_dates, start_ts, side='left'), np.searchsorted(combined_dates, end_ts, side='right')
+        combined_df = combined_df.iloc[lo:hi]
+
+    # Remaining criteria as one fused boolean mask over the date slice
+    cube_mask = np.ones(len(cube), dtype=bool)
+
+    if platforms:
+        cube_mask &= cube.index.get_level_values('platform').isin(platforms)
+
     if states:
-        marketing_df = marketing_df[marketing_df['state'].isin(states)]
-    
+        cube_mask &= cube.index.get_level_values('state').isin(states)
+
+    cube = cube[cube_mask]
+
+    # Reruns triggered by widgets that don't touch the filters (tab clicks,
+    # etc.) reuse the already-parsed figures from session state; only a
+    # changed filter signature invalidates them
+    filter_sig = (tuple(date_range), tuple(sorted(platforms)), tuple(sorted(states)))
+    if st.session_state.get('filter_sig') != filter_sig:
+        st.session_state['filter_sig'] = filter_sig
+        st.session_state['figs'] = {}
+    session_figs = st.session_state['figs']
+
+    def chart(name, df):
+        if name not in session_figs:
+            session_figs[name] = cached_chart(name, df, filter_sig)
+        return session_figs[name]
+
     # Main content
     st.markdown("---")
     
@@ -645,16 +952,16 @@ def main():
     col1, col2 = st.columns(2)
     
     with col1:
-        st.plotly_chart(create_revenue_trend_chart(combined_df), use_container_width=True)
+        st.plotly_chart(chart('revenue_trend', combined_df), use_container_width=True)
     
     with col2:
-        st.plotly_chart(create_platform_performance_chart(marketing_df), use_container_width=True)
+        st.plotly_chart(chart('platform_performance', cube), use_container_width=True)
     
     st.markdown("---")
     
     # Tactic Performance
     st.subheader("🎯 Tactic Performance Analysis")
-    st.plotly_chart(create_tactic_performance_chart(marketing_df), use_container_width=True)
+    st.plotly_chart(chart('tactic_performance', cube), use_container_width=True)
     
     st.markdown("---")
     
@@ -662,13 +969,19 @@ def main():
     st.subheader("🗺️ State-wise Performance Analysis")
     
     # Generate state metrics
-    state_metrics = create_state_wise_analysis(marketing_df)
-    
-    # State KPI Cards
+    state_metrics = create_state_wise_analysis(cube)
+    
+    # State KPI Cards: one argmax pass over the three KPI columns instead
+    # of three separate idxmax/idxmin scans (cpc is negated so min-is-best
+    # fits the same pass)
+    kpi = state_metrics[['attributed revenue', 'ctr', 'cpc']].to_numpy(dtype=np.float64)
+    kpi[:, 2] = -kpi[:, 2]
+    best_state_revenue, best_state_ctr, best_state_cpc = (
+        state_metrics.iloc[i] for i in kpi.argmax(axis=0))
+
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        best_state_revenue = state_metrics.loc[state_metrics['attributed revenue'].idxmax()]
         st.metric(
             label="🏆 Top Revenue State",
             value=best_state_revenue['state'],
@@ -676,7 +989,6 @@ def main():
         )
     
     with col2:
-        best_state_ctr = state_metrics.loc[state_metrics['ctr'].idxmax()]
         st.metric(
             label="📈 Best CTR State",
             value=best_state_ctr['state'],
@@ -684,7 +996,6 @@ def main():
         )
     
     with col3:
-        best_state_cpc = state_metrics.loc[state_metrics['cpc'].idxmin()]
         st.metric(
             label="💰 Best CPC State",
             value=best_state_cpc['state'],
@@ -706,10 +1017,10 @@ def main():
     col1, col2 = st.columns(2)
     
     with col1:
-        st.plotly_chart(create_state_performance_chart(state_metrics), use_container_width=True)
+        st.plotly_chart(chart('state_performance', state_metrics), use_container_width=True)
     
     with col2:
-        st.plotly_chart(create_state_platform_breakdown(marketing_df), use_container_width=True)
+        st.plotly_chart(chart('state_platform_breakdown', cube), use_container_width=True)
     
     st.markdown("---")
     
@@ -717,16 +1028,16 @@ def main():
     col1, col2 = st.columns(2)
     
     with col1:
-        st.plotly_chart(create_geographic_analysis(marketing_df), use_container_width=True)
+        st.plotly_chart(chart('geographic', cube), use_container_width=True)
     
     with col2:
-        st.plotly_chart(create_campaign_analysis(marketing_df), use_container_width=True)
+        st.plotly_chart(chart('campaign', cube), use_container_width=True)
     
     st.markdown("---")
     
     # Correlation Analysis
     st.subheader("🔗 Marketing-Business Correlation Analysis")
-    st.plotly_chart(create_correlation_analysis(combined_df), use_container_width=True)
+    st.plotly_chart(chart('correlation', combined_df), use_container_width=True)
     
     st.markdown("---")
     
@@ -734,24 +1045,24 @@ def main():
     st.subheader("📋 Detailed Data")
     
     tab1, tab2, tab3, tab4 = st.tabs(["Business Metrics", "Marketing Performance", "State-wise Analysis", "Combined View"])
-    
+
+    # Built once per filter state; switching tabs reruns the script but the
+    # rounded display frames come straight from cache
+    business_view, marketing_view, state_view, combined_view = _tab_views(
+        combined_df, marketing_df, state_metrics,
+        date_window, tuple(platforms), tuple(states))
+
     with tab1:
-        st.dataframe(combined_df[['date', '# of orders', 'new customers', 'total revenue', 
-                                 'gross profit', 'avg_order_value', 'profit_margin']].round(2))
-    
+        st.dataframe(business_view, column_config=_two_decimal_config(business_view))
+
     with tab2:
-        st.dataframe(marketing_df[['date', 'platform', 'tactic', 'state', 'campaign', 
-                                  'impression', 'clicks', 'spend', 'attributed revenue', 
-                                  'ctr', 'cpc']].round(2))
-    
+        st.dataframe(marketing_view, column_config=_two_decimal_config(marketing_view))
+
     with tab3:
-        st.dataframe(state_metrics[['state', 'spend', 'attributed revenue', 'impression', 
-                                   'clicks', 'ctr', 'cpc', 'cpm', 'platform']].round(2))
-    
+        st.dataframe(state_view, column_config=_two_decimal_config(state_view))
+
     with tab4:
-        st.dataframe(combined_df[['date', 'total revenue', 'spend', 'attributed revenue', 
-                                 'ctr', 'cpc', 'marketing_attribution_rate', 
-                                 'customer_acquisition_cost']].round(2))
+        st.dataframe(combined_view, column_config=_two_decimal_config(combined_view))
     
     # Footer
     st.markdown("---")